@@ -0,0 +1,105 @@
+"""
+Shared MongoDB client for the PetLove database scripts
+Caches one client per event loop so chained scripts reuse the same connection
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+import bson
+from bson.raw_bson import RawBSONDocument
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+_clients = {}
+
+async def get_client():
+    """Return the MongoDB client for the running event loop, or None if not configured"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None:
+        return client
+
+    # Get MongoDB URI from environment
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI not found in environment variables")
+        return None
+
+    print(f"Connecting to MongoDB...")
+
+    # Atlas (mongodb+srv) needs TLS; local and CI databases usually don't
+    tls_enabled = (
+        mongodb_uri.startswith("mongodb+srv://")
+        or "tls=true" in mongodb_uri.lower()
+        or "ssl=true" in mongodb_uri.lower()
+        or os.getenv("MONGO_TLS") == "1"
+    )
+    tls_options = {"tls": True, "tlsAllowInvalidCertificates": False} if tls_enabled else {"tls": False}
+
+    # Create MongoDB client
+    client = AsyncMongoClient(
+        mongodb_uri,
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=10000,
+        socketTimeoutMS=10000,
+        **tls_options
+    )
+    _clients[loop] = client
+    return client
+
+async def close_client():
+    """Close and forget the client for the running event loop"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Batches at least this large are BSON-encoded in worker processes before inserting
+LARGE_BATCH_SIZE = 10000
+ENCODE_CHUNK_SIZE = 1000
+
+def _encode_chunk(documents):
+    """Encode a chunk of documents to BSON (runs in a worker process)"""
+    return [bson.encode(document) for document in documents]
+
+async def insert_many_encoded(collection, documents, ordered=False):
+    """insert_many that moves BSON encoding of large batches off the event loop"""
+    if len(documents) < LARGE_BATCH_SIZE:
+        return await collection.insert_many(documents, ordered=ordered)
+
+    loop = asyncio.get_running_loop()
+    chunks = [
+        documents[i:i + ENCODE_CHUNK_SIZE]
+        for i in range(0, len(documents), ENCODE_CHUNK_SIZE)
+    ]
+    with ProcessPoolExecutor() as pool:
+        encoded = await asyncio.gather(*[
+            loop.run_in_executor(pool, _encode_chunk, chunk) for chunk in chunks
+        ])
+
+    # The driver sends RawBSONDocument bytes as-is instead of re-encoding them
+    raw_documents = [RawBSONDocument(data) for chunk in encoded for data in chunk]
+    return await collection.insert_many(raw_documents, ordered=ordered)
+
+def raise_unless_duplicates(error):
+    """Re-raise a BulkWriteError unless every write error is a duplicate key; return the duplicate indexes"""
+    write_errors = error.details.get("writeErrors", [])
+    if error.details.get("writeConcernErrors") or any(
+        write_error["code"] != DUPLICATE_KEY_ERROR for write_error in write_errors
+    ):
+        raise error
+    return {write_error["index"] for write_error in write_errors}
+
+async def insert_many_skip_duplicates(collection, documents):
+    """Insert documents unordered and return the batch indexes rejected as duplicates"""
+    try:
+        await insert_many_encoded(collection, documents)
+    except BulkWriteError as e:
+        return raise_unless_duplicates(e)
+    return set()
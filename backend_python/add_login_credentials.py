@@ -5,48 +5,33 @@ This script updates the existing users with passwords for login functionality
 """
 
 import asyncio
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+from _db import get_client, close_client, raise_unless_duplicates
+import bcrypt
 from datetime import datetime
-from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
 
-# Load environment variables
-load_dotenv()
-
-async def add_login_credentials():
+async def add_login_credentials(client=None):
     """Add login credentials to existing users and create test users"""
     
-    # Get MongoDB URI from environment
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        print("❌ MONGODB_URI not found in environment variables")
-        return False
-    
-    print(f"Connecting to MongoDB...")
-    
-    # Create MongoDB client
-    client = AsyncIOMotorClient(
-        mongodb_uri,
-        serverSelectionTimeoutMS=5000,
-        connectTimeoutMS=10000,
-        socketTimeoutMS=10000,
-        tls=True,
-        tlsAllowInvalidCertificates=False
-    )
+    # Reuse the caller's client, or open our own
+    owns_client = client is None
+    if owns_client:
+        client = await get_client()
+        if client is None:
+            return False
     
     try:
         # Test connection
         await client.admin.command('ping')
         print("✅ Connected to MongoDB successfully!")
         
-        # Get the petlove database
-        db = client.petlove
+        # Get the petlove database; seed data doesn't need majority-acknowledged writes
+        db = client.get_database("petlove", write_concern=WriteConcern(w=1, j=False))
         
-        print("\n🔐 Adding passwords to existing users...")
-        
-        # Update existing users with passwords
-        existing_users = await db.users.find({}).to_list(length=None)
+        # One timestamp shared by every document created in this run
+        now = datetime.utcnow()
         
         user_credentials = [
             {"email": "john.doe@example.com", "password": "password123"},
@@ -54,81 +39,124 @@ async def add_login_credentials():
             {"email": "mike.johnson@example.com", "password": "password789"}
         ]
         
-        for user in existing_users:
-            # Find matching credentials
-            cred = next((c for c in user_credentials if c["email"] == user["email"]), None)
-            if cred and "password" not in user:
-                # Update user with password
-                await db.users.update_one(
-                    {"_id": user["_id"]},
-                    {"$set": {
-                        "password": cred["password"],
-                        "updated_at": datetime.utcnow()
-                    }}
-                )
-                print(f"✅ Added password to user: {user['email']}")
-            elif "password" in user:
-                print(f"ℹ️  User already has password: {user['email']}")
-        
-        # Create additional test users with login credentials
-        print("\n👥 Creating additional test users with login credentials...")
-        
         test_users = [
             {
-                "_id": ObjectId(),
                 "name": "Test User",
                 "email": "test@example.com",
                 "password": "test123",
                 "phone": "+1234567893",
                 "address": "123 Test St, Test City, TC 12345",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             },
             {
-                "_id": ObjectId(),
                 "name": "Demo User",
                 "email": "demo@example.com", 
                 "password": "demo123",
                 "phone": "+1234567894",
                 "address": "456 Demo Ave, Demo City, DC 12346",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             },
             {
-                "_id": ObjectId(),
                 "name": "Admin User",
                 "email": "admin@petlove.com",
                 "password": "admin123",
                 "phone": "+1234567895",
                 "address": "789 Admin Blvd, Admin City, AC 12347",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
         ]
         
+        # Look up every email we care about in a single query
+        emails = [c["email"] for c in user_credentials] + [u["email"] for u in test_users]
+        existing_users = await db.users.find(
+            {"email": {"$in": emails}},
+            {"email": 1, "password": 1}
+        ).to_list(length=None)
+        
+        # Work out which users need a password written before hashing anything
+        cred_by_email = {c["email"]: c["password"] for c in user_credentials}
+        existing_emails = {user["email"] for user in existing_users}
+        emails_to_update = {
+            user["email"] for user in existing_users
+            if "password" not in user and user["email"] in cred_by_email
+        }
+        emails_to_insert = {user["email"] for user in test_users} - existing_emails
+        
+        # Hash each password once, up front (bcrypt is deliberately slow)
+        plain_passwords = {**cred_by_email, **{u["email"]: u["password"] for u in test_users}}
+        hashed_passwords = {
+            email: bcrypt.hashpw(plain_passwords[email].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            for email in emails_to_update | emails_to_insert
+        }
+        
+        operations = []
+        # Email each operation writes, so rejected duplicates can be matched back to a user
+        operation_emails = []
+        # Collect status lines and print them in one write once the batch is stored
+        report = ["\n🔐 Adding passwords to existing users..."]
+        
+        # Update existing users with passwords (the filter re-checks server-side)
+        for user in existing_users:
+            if user["email"] in emails_to_update:
+                operations.append(UpdateOne(
+                    {"email": user["email"], "password": {"$exists": False}},
+                    {"$set": {
+                        "password": hashed_passwords[user["email"]],
+                        "updated_at": now
+                    }}
+                ))
+                operation_emails.append(user["email"])
+                report.append(f"✅ Added password to user: {user['email']}")
+            elif "password" in user:
+                report.append(f"ℹ️  User already has password: {user['email']}")
+        
+        # Create additional test users with login credentials
+        report.append("\n👥 Creating additional test users with login credentials...")
+        
         # Insert test users (skip if already exist)
         for user in test_users:
-            existing = await db.users.find_one({"email": user["email"]})
-            if not existing:
-                await db.users.insert_one(user)
-                print(f"✅ Created test user: {user['name']} ({user['email']})")
+            if user["email"] in emails_to_insert:
+                operations.append(InsertOne({**user, "password": hashed_passwords[user["email"]]}))
+                operation_emails.append(user["email"])
+                report.append(f"✅ Created test user: {user['name']} ({user['email']})")
             else:
-                print(f"ℹ️  Test user already exists: {user['email']}")
+                report.append(f"ℹ️  Test user already exists: {user['email']}")
         
-        # Display all users with their login credentials
-        print("\n📋 Available Login Credentials:")
-        print("=" * 50)
+        # Only passwords this run actually stored are known in plain text
+        written_emails = set(operation_emails)
+        if operations:
+            try:
+                await db.users.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # A test user created since our lookup is fine; the unique email index wins
+                duplicates = raise_unless_duplicates(e)
+                written_emails -= {operation_emails[index] for index in duplicates}
+        
+        print("\n".join(report))
         
-        all_users = await db.users.find({}).to_list(length=None)
+        # Display all users with their login credentials
+        print("\n📋 Available Login Credentials:\n" + "=" * 50)
         
-        for user in all_users:
-            if "password" in user:
-                print(f"📧 Email: {user['email']}")
-                print(f"🔑 Password: {user['password']}")
-                print(f"👤 Name: {user['name']}")
-                print("-" * 30)
+        # Stream users batch by batch instead of loading the whole collection
+        total_users = 0
+        async for user in db.users.find(
+            {"password": {"$exists": True}},
+            {"email": 1, "name": 1}
+        ):
+            total_users += 1
+            # Stored passwords are bcrypt hashes; show the plain text only for the ones written above
+            password = plain_passwords[user['email']] if user['email'] in written_emails else '(hashed)'
+            print(
+                f"📧 Email: {user['email']}\n"
+                f"🔑 Password: {password}\n"
+                f"👤 Name: {user['name']}\n"
+                + "-" * 30
+            )
         
-        print(f"\n📊 Total users with login credentials: {len(all_users)}")
+        print(f"\n📊 Total users with login credentials: {total_users}")
         
         return True
         
@@ -137,7 +165,8 @@ async def add_login_credentials():
         return False
         
     finally:
-        client.close()
+        if owns_client:
+            await close_client()
 
 if __name__ == "__main__":
     print("🚀 Adding login credentials to PetLove users...")
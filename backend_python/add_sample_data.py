@@ -5,160 +5,112 @@ This script adds sample data to test the PetLove application
 """
 
 import asyncio
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+from _db import get_client, close_client, insert_many_encoded, insert_many_skip_duplicates
 from datetime import datetime, timedelta
 from bson import ObjectId
+from pymongo.write_concern import WriteConcern
 
-# Load environment variables
-load_dotenv()
+# Sample users: (name, email, phone, address)
+USER_ROWS = (
+    ("John Doe", "john.doe@example.com", "+1234567890", "123 Main St, City, State 12345"),
+    ("Jane Smith", "jane.smith@example.com", "+1234567891", "456 Oak Ave, City, State 12346"),
+    ("Mike Johnson", "mike.johnson@example.com", "+1234567892", "789 Pine Rd, City, State 12347"),
+)
 
-async def add_sample_data():
+# Sample pets: (name, species, breed, age, color, size, gender, description, adoption_status, price, images)
+PET_ROWS = (
+    ("Buddy", "Dog", "Golden Retriever", 3, "Golden", "Large", "Male",
+     "Friendly and energetic dog, great with kids", "available", 500.00, ("buddy1.jpg", "buddy2.jpg")),
+    ("Whiskers", "Cat", "Persian", 2, "White", "Medium", "Female",
+     "Calm and affectionate cat, loves to cuddle", "available", 300.00, ("whiskers1.jpg",)),
+    ("Charlie", "Dog", "Labrador", 1, "Black", "Large", "Male",
+     "Playful puppy, needs training", "adopted", 600.00, ("charlie1.jpg", "charlie2.jpg")),
+)
+
+def make_user(now, name, email, phone, address):
+    """Build a sample user document"""
+    return {
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "address": address,
+        "created_at": now,
+        "updated_at": now
+    }
+
+def make_pet(now, name, species, breed, age, color, size, gender, description, adoption_status, price, images):
+    """Build a sample pet document"""
+    return {
+        "name": name,
+        "species": species,
+        "breed": breed,
+        "age": age,
+        "color": color,
+        "size": size,
+        "gender": gender,
+        "description": description,
+        "adoption_status": adoption_status,
+        "price": price,
+        "images": list(images),
+        "created_at": now,
+        "updated_at": now
+    }
+
+async def add_sample_data(client=None):
     """Add sample data to the PetLove database"""
     
-    # Get MongoDB URI from environment
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        print("❌ MONGODB_URI not found in environment variables")
-        return False
-    
-    print(f"Connecting to MongoDB...")
-    
-    # Create MongoDB client
-    client = AsyncIOMotorClient(
-        mongodb_uri,
-        serverSelectionTimeoutMS=5000,
-        connectTimeoutMS=10000,
-        socketTimeoutMS=10000,
-        tls=True,
-        tlsAllowInvalidCertificates=False
-    )
+    # Reuse the caller's client, or open our own
+    owns_client = client is None
+    if owns_client:
+        client = await get_client()
+        if client is None:
+            return False
     
     try:
         # Test connection
         await client.admin.command('ping')
         print("✅ Connected to MongoDB successfully!")
         
-        # Get the petlove database
-        db = client.petlove
+        # Get the petlove database; seed data doesn't need majority-acknowledged writes
+        db = client.get_database("petlove", write_concern=WriteConcern(w=1, j=False))
+        
+        # One timestamp shared by every document created in this run
+        now = datetime.utcnow()
         
         # Sample Users
         print("\n👥 Adding sample users...")
-        sample_users = [
-            {
-                "_id": ObjectId(),
-                "name": "John Doe",
-                "email": "john.doe@example.com",
-                "phone": "+1234567890",
-                "address": "123 Main St, City, State 12345",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            },
-            {
-                "_id": ObjectId(),
-                "name": "Jane Smith",
-                "email": "jane.smith@example.com", 
-                "phone": "+1234567891",
-                "address": "456 Oak Ave, City, State 12346",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            },
-            {
-                "_id": ObjectId(),
-                "name": "Mike Johnson",
-                "email": "mike.johnson@example.com",
-                "phone": "+1234567892", 
-                "address": "789 Pine Rd, City, State 12347",
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-        ]
+        sample_users = [make_user(now, *row) for row in USER_ROWS]
         
-        # Insert users (skip if already exist)
-        for user in sample_users:
-            existing = await db.users.find_one({"email": user["email"]})
-            if not existing:
-                await db.users.insert_one(user)
-                print(f"✅ Added user: {user['name']}")
-            else:
-                print(f"ℹ️  User already exists: {user['name']}")
+        # Insert users; the unique email index rejects the ones that already exist
+        duplicates = await insert_many_skip_duplicates(db.users, sample_users)
+        # Report each collection with a single write rather than one print per document
+        print("\n".join(
+            f"ℹ️  User already exists: {user['name']}" if i in duplicates
+            else f"✅ Added user: {user['name']}"
+            for i, user in enumerate(sample_users)
+        ))
         
         # Get user IDs for relationships
-        users = await db.users.find({}).to_list(length=None)
-        user_ids = [user["_id"] for user in users]
+        user_ids = [user["_id"] async for user in db.users.find({}, {"_id": 1})]
         
         # Sample Pets
         print("\n🐕 Adding sample pets...")
-        sample_pets = [
-            {
-                "_id": ObjectId(),
-                "name": "Buddy",
-                "species": "Dog",
-                "breed": "Golden Retriever",
-                "age": 3,
-                "color": "Golden",
-                "size": "Large",
-                "gender": "Male",
-                "description": "Friendly and energetic dog, great with kids",
-                "adoption_status": "available",
-                "price": 500.00,
-                "images": ["buddy1.jpg", "buddy2.jpg"],
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            },
-            {
-                "_id": ObjectId(),
-                "name": "Whiskers",
-                "species": "Cat",
-                "breed": "Persian",
-                "age": 2,
-                "color": "White",
-                "size": "Medium",
-                "gender": "Female",
-                "description": "Calm and affectionate cat, loves to cuddle",
-                "adoption_status": "available",
-                "price": 300.00,
-                "images": ["whiskers1.jpg"],
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            },
-            {
-                "_id": ObjectId(),
-                "name": "Charlie",
-                "species": "Dog",
-                "breed": "Labrador",
-                "age": 1,
-                "color": "Black",
-                "size": "Large",
-                "gender": "Male",
-                "description": "Playful puppy, needs training",
-                "adoption_status": "adopted",
-                "price": 600.00,
-                "images": ["charlie1.jpg", "charlie2.jpg"],
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-        ]
+        sample_pets = [make_pet(now, *row) for row in PET_ROWS]
         
-        # Insert pets (skip if already exist)
-        for pet in sample_pets:
-            existing = await db.pets.find_one({"name": pet["name"], "breed": pet["breed"]})
-            if not existing:
-                await db.pets.insert_one(pet)
-                print(f"✅ Added pet: {pet['name']} ({pet['species']})")
-            else:
-                print(f"ℹ️  Pet already exists: {pet['name']}")
+        # Insert pets; the unique (name, breed) index rejects the ones that already exist
+        duplicates = await insert_many_skip_duplicates(db.pets, sample_pets)
+        print("\n".join(
+            f"ℹ️  Pet already exists: {pet['name']}" if i in duplicates
+            else f"✅ Added pet: {pet['name']} ({pet['species']})"
+            for i, pet in enumerate(sample_pets)
+        ))
         
         # Get pet IDs for relationships
-        pets = await db.pets.find({}).to_list(length=None)
-        pet_ids = [pet["_id"] for pet in pets]
+        pet_ids = [pet["_id"] async for pet in db.pets.find({}, {"_id": 1})]
         
         # Sample Orders
-        print("\n🛒 Adding sample orders...")
         sample_orders = [
             {
-                "_id": ObjectId(),
                 "user_id": user_ids[0] if user_ids else ObjectId(),
                 "items": [
                     {"product_name": "Dog Food Premium", "quantity": 2, "price": 45.99},
@@ -166,13 +118,12 @@ async def add_sample_data():
                 ],
                 "total_amount": 104.97,
                 "status": "delivered",
-                "order_date": datetime.utcnow() - timedelta(days=5),
-                "delivery_date": datetime.utcnow() - timedelta(days=2),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "order_date": now - timedelta(days=5),
+                "delivery_date": now - timedelta(days=2),
+                "created_at": now,
+                "updated_at": now
             },
             {
-                "_id": ObjectId(),
                 "user_id": user_ids[1] if len(user_ids) > 1 else ObjectId(),
                 "items": [
                     {"product_name": "Cat Litter", "quantity": 1, "price": 24.99},
@@ -180,80 +131,63 @@ async def add_sample_data():
                 ],
                 "total_amount": 51.96,
                 "status": "processing",
-                "order_date": datetime.utcnow() - timedelta(days=1),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "order_date": now - timedelta(days=1),
+                "created_at": now,
+                "updated_at": now
             }
         ]
         
-        # Insert orders
-        for order in sample_orders:
-            await db.orders.insert_one(order)
-            print(f"✅ Added order: ${order['total_amount']}")
-        
         # Sample Adoptions
-        print("\n🏠 Adding sample adoptions...")
+        sample_adoptions = []
         if user_ids and pet_ids:
             sample_adoptions = [
                 {
-                    "_id": ObjectId(),
                     "user_id": user_ids[0],
                     "pet_id": pet_ids[2] if len(pet_ids) > 2 else pet_ids[0],  # Charlie (adopted)
-                    "adoption_date": datetime.utcnow() - timedelta(days=10),
+                    "adoption_date": now - timedelta(days=10),
                     "status": "completed",
                     "adoption_fee": 600.00,
                     "notes": "Great match! Charlie loves his new family.",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
+                    "created_at": now,
+                    "updated_at": now
                 }
             ]
-            
-            for adoption in sample_adoptions:
-                await db.adoptions.insert_one(adoption)
-                print(f"✅ Added adoption record")
         
         # Sample Appointments
-        print("\n📅 Adding sample appointments...")
+        sample_appointments = []
         if user_ids:
             sample_appointments = [
                 {
-                    "_id": ObjectId(),
                     "user_id": user_ids[0],
                     "appointment_type": "Veterinary Checkup",
-                    "appointment_date": datetime.utcnow() + timedelta(days=3),
+                    "appointment_date": now + timedelta(days=3),
                     "duration_minutes": 60,
                     "status": "scheduled",
                     "notes": "Annual checkup for Buddy",
                     "veterinarian": "Dr. Sarah Wilson",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
+                    "created_at": now,
+                    "updated_at": now
                 },
                 {
-                    "_id": ObjectId(),
                     "user_id": user_ids[1] if len(user_ids) > 1 else user_ids[0],
                     "appointment_type": "Grooming",
-                    "appointment_date": datetime.utcnow() + timedelta(days=7),
+                    "appointment_date": now + timedelta(days=7),
                     "duration_minutes": 90,
                     "status": "scheduled",
                     "notes": "Full grooming service for Whiskers",
                     "veterinarian": "Groomer Mike",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
+                    "created_at": now,
+                    "updated_at": now
                 }
             ]
-            
-            for appointment in sample_appointments:
-                await db.appointments.insert_one(appointment)
-                print(f"✅ Added appointment: {appointment['appointment_type']}")
         
         # Sample Visits
-        print("\n🏥 Adding sample visits...")
+        sample_visits = []
         if user_ids:
             sample_visits = [
                 {
-                    "_id": ObjectId(),
                     "user_id": user_ids[0],
-                    "visit_date": datetime.utcnow() - timedelta(days=30),
+                    "visit_date": now - timedelta(days=30),
                     "visit_type": "Emergency",
                     "reason": "Buddy injured his paw during play",
                     "diagnosis": "Minor cut, cleaned and bandaged",
@@ -261,22 +195,49 @@ async def add_sample_data():
                     "cost": 125.00,
                     "veterinarian": "Dr. Sarah Wilson",
                     "follow_up_required": False,
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
+                    "created_at": now,
+                    "updated_at": now
                 }
             ]
-            
-            for visit in sample_visits:
-                await db.visits.insert_one(visit)
-                print(f"✅ Added visit record: {visit['visit_type']}")
+        
+        # The remaining collections only depend on user/pet IDs, so insert them concurrently
+        batches = [
+            (db.orders, sample_orders),
+            (db.adoptions, sample_adoptions),
+            (db.appointments, sample_appointments),
+            (db.visits, sample_visits),
+        ]
+        await asyncio.gather(*[
+            insert_many_encoded(collection, docs)
+            for collection, docs in batches if docs
+        ])
+        
+        report = ["\n🛒 Adding sample orders..."]
+        report += [f"✅ Added order: ${order['total_amount']}" for order in sample_orders]
+        
+        report.append("\n🏠 Adding sample adoptions...")
+        if sample_adoptions:
+            report.append(f"✅ Added {len(sample_adoptions)} adoption record(s)")
+        
+        report.append("\n📅 Adding sample appointments...")
+        report += [f"✅ Added appointment: {a['appointment_type']}" for a in sample_appointments]
+        
+        report.append("\n🏥 Adding sample visits...")
+        report += [f"✅ Added visit record: {visit['visit_type']}" for visit in sample_visits]
+        print("\n".join(report))
         
         # Verify data was added
         print("\n📊 Verifying sample data...")
         collections = ['users', 'pets', 'orders', 'adoptions', 'appointments', 'visits']
         
-        for collection_name in collections:
-            count = await db[collection_name].count_documents({})
-            print(f"✅ {collection_name}: {count} documents")
+        # Metadata counts are enough for a sanity check and avoid a scan per collection
+        counts = await asyncio.gather(*[
+            db[collection_name].estimated_document_count() for collection_name in collections
+        ])
+        print("\n".join(
+            f"✅ {collection_name}: {count} documents"
+            for collection_name, count in zip(collections, counts)
+        ))
         
         print(f"\n🎉 Sample data added successfully!")
         
@@ -287,7 +248,8 @@ async def add_sample_data():
         return False
         
     finally:
-        client.close()
+        if owns_client:
+            await close_client()
 
 if __name__ == "__main__":
     print("🚀 Adding sample data to PetLove database...")
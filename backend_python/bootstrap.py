@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Full database bootstrap for PetLove
+Runs init, sample data, login credentials and the database check over one shared connection
+"""
+
+import asyncio
+from _db import get_client, close_client
+from init_database import init_database
+from add_sample_data import add_sample_data
+from add_login_credentials import add_login_credentials
+from check_database import check_database
+
+async def bootstrap():
+    """Run every setup step in order, stopping at the first failure"""
+
+    client = await get_client()
+    if client is None:
+        return False
+
+    try:
+        for step in (init_database, add_sample_data, add_login_credentials, check_database):
+            print(f"\n▶️  Running {step.__name__}...")
+            if not await step(client):
+                return False
+        return True
+
+    finally:
+        await close_client()
+
+if __name__ == "__main__":
+    print("🚀 Bootstrapping PetLove database...")
+    success = asyncio.run(bootstrap())
+
+    if success:
+        print("\n✨ Database bootstrap completed!")
+    else:
+        print("\n💥 Database bootstrap failed!")
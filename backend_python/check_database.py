@@ -4,33 +4,17 @@ Check database contents to verify users are inserted
 """
 
 import asyncio
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+from _db import get_client, close_client
 
-# Load environment variables
-load_dotenv()
-
-async def check_database():
+async def check_database(client=None):
     """Check database contents"""
     
-    # Get MongoDB URI from environment
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        print("❌ MONGODB_URI not found in environment variables")
-        return False
-    
-    print(f"Connecting to MongoDB...")
-    
-    # Create MongoDB client
-    client = AsyncIOMotorClient(
-        mongodb_uri,
-        serverSelectionTimeoutMS=5000,
-        connectTimeoutMS=10000,
-        socketTimeoutMS=10000,
-        tls=True,
-        tlsAllowInvalidCertificates=False
-    )
+    # Reuse the caller's client, or open our own
+    owns_client = client is None
+    if owns_client:
+        client = await get_client()
+        if client is None:
+            return False
     
     try:
         # Test connection
@@ -53,8 +37,11 @@ async def check_database():
         # Specifically check users collection
         if "users" in collections:
             print("\n👥 Users in database:")
-            users = await db.users.find({}).to_list(length=None)
-            for i, user in enumerate(users, 1):
+            # Stream users batch by batch instead of loading the whole collection
+            users = db.users.find({}, {"name": 1, "email": 1})
+            i = 0
+            async for user in users:
+                i += 1
                 print(f"  {i}. {user.get('name', 'No name')} ({user.get('email', 'No email')})")
         
         return True
@@ -64,7 +51,8 @@ async def check_database():
         return False
         
     finally:
-        client.close()
+        if owns_client:
+            await close_client()
 
 if __name__ == "__main__":
     print("🔍 Checking database contents...")
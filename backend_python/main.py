@@ -2,67 +2,97 @@ from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from contextlib import asynccontextmanager
+import asyncio
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import time
-import json
+import orjson
 from datetime import datetime
+from typing import Any, Dict
 from dotenv import load_dotenv
 
+# Load environment variables from a local .env when there is one (deployments set them directly).
+# This runs before the router imports because they read settings such as BCRYPT_ROUNDS at import time
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(ENV_FILE):
+    load_dotenv(ENV_FILE)
+
 from routers import users, pets, orders, adoptions, appointments, visits
 from static_server import setup_static_files
 
-# Load environment variables
-load_dotenv()
+# Handlers only enqueue records; a background thread does the blocking stdout writes
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(log_queue)]
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+logger = logging.getLogger(__name__)
+
+# Request bodies are only read and logged when explicitly asked for
+DEBUG_BODY = os.getenv("DEBUG_BODY") == "1"
+
+# Only debug specific endpoints (a tuple so startswith checks them all in one call)
+DEBUG_PATHS = ("/api/users/login", "/api/users/register", "/api/users/")
 
 # Comprehensive debugging middleware
 async def debug_middleware(request: Request, call_next):
-    # Only debug specific endpoints
-    debug_paths = ["/api/users/login", "/api/users/register", "/api/users/"]
+    # CORS preflights carry nothing worth debugging
+    if request.method == "OPTIONS" or not request.url.path.startswith(DEBUG_PATHS):
+        return await call_next(request)
     
-    if not any(request.url.path.startswith(path) for path in debug_paths):
+    # Skip building any of the debug output unless it will be emitted
+    if not logger.isEnabledFor(logging.DEBUG):
         return await call_next(request)
     
     start_time = time.time()
     
     # Log request details
-    print("\n🚨 DETAILED REQUEST DEBUG:")
-    print(f"⏰ Request Time: {datetime.now().isoformat()}")
-    print(f"🔧 Method: {request.method}")
-    print(f"📍 Full URL: {request.url}")
-    print(f"🖥️ Client IP: {request.client.host if request.client else 'Unknown'}")
+    lines = [
+        "🚨 DETAILED REQUEST DEBUG:",
+        f"⏰ Request Time: {datetime.now().isoformat()}",
+        f"🔧 Method: {request.method}",
+        f"📍 Full URL: {request.url}",
+        f"🖥️ Client IP: {request.client.host if request.client else 'Unknown'}",
+    ]
     
     # Headers analysis
-    print("\n📋 REQUEST HEADERS:")
-    for key, value in request.headers.items():
-        print(f"   {key}: {value}")
+    lines.append("📋 REQUEST HEADERS:")
+    lines.extend(f"   {key}: {value}" for key, value in request.headers.items())
     
     # Query parameters
     if request.query_params:
-        print("\n🔍 QUERY PARAMETERS:")
-        for key, value in request.query_params.items():
-            print(f"   {key}: {value}")
+        lines.append("🔍 QUERY PARAMETERS:")
+        lines.extend(f"   {key}: {value}" for key, value in request.query_params.items())
     
-    # Body analysis
-    print("\n📦 REQUEST BODY:")
-    try:
-        # Read the body
-        body = await request.body()
-        print(f"   Raw Body Length: {len(body)} bytes")
-        
-        if body:
-            try:
-                # Try to parse as JSON
-                body_json = json.loads(body.decode('utf-8'))
-                print(f"   Body Type: JSON")
-                print(f"   Body Keys: {list(body_json.keys()) if isinstance(body_json, dict) else 'Not a dict'}")
-                print(f"   Body Content: {body_json}")
-            except json.JSONDecodeError:
-                print(f"   Body Type: Raw bytes")
-                print(f"   Body Content: {body.decode('utf-8', errors='replace')}")
-        else:
-            print("   Body: Empty")
-    except Exception as e:
-        print(f"   Body Read Error: {str(e)}")
+    # Body analysis (Starlette caches the body, so the route handler reuses it)
+    if DEBUG_BODY:
+        lines.append("📦 REQUEST BODY:")
+        try:
+            body = await request.body()
+            lines.append(f"   Raw Body Length: {len(body)} bytes")
+            
+            if body:
+                try:
+                    # Try to parse as JSON
+                    body_json = orjson.loads(body)
+                    lines.append("   Body Type: JSON")
+                    lines.append(f"   Body Keys: {list(body_json.keys()) if isinstance(body_json, dict) else 'Not a dict'}")
+                    lines.append(f"   Body Content: {body_json}")
+                except orjson.JSONDecodeError:
+                    lines.append("   Body Type: Raw bytes")
+                    lines.append(f"   Body Content: {body.decode('utf-8', errors='replace')}")
+            else:
+                lines.append("   Body: Empty")
+        except Exception as e:
+            lines.append(f"   Body Read Error: {str(e)}")
+    
+    logger.debug("\n".join(lines))
     
     # Process the request
     try:
@@ -72,13 +102,12 @@ async def debug_middleware(request: Request, call_next):
         end_time = time.time()
         response_time = (end_time - start_time) * 1000  # Convert to milliseconds
         
-        print("\n📤 RESPONSE DEBUG:")
-        print(f"   Status Code: {response.status_code}")
-        print(f"   Response Time: {response_time:.2f}ms")
-        print(f"   Response Headers: {dict(response.headers)}")
-        
-        # Try to read response body for logging (this is tricky with FastAPI)
-        print("=====================================\n")
+        logger.debug(
+            "📤 RESPONSE DEBUG:\n"
+            f"   Status Code: {response.status_code}\n"
+            f"   Response Time: {response_time:.2f}ms\n"
+            f"   Response Headers: {dict(response.headers)}"
+        )
         
         return response
         
@@ -86,38 +115,66 @@ async def debug_middleware(request: Request, call_next):
         end_time = time.time()
         response_time = (end_time - start_time) * 1000
         
-        print("\n❌ REQUEST FAILED:")
-        print(f"   Error: {str(e)}")
-        print(f"   Error Type: {type(e).__name__}")
-        print(f"   Response Time: {response_time:.2f}ms")
-        print("=====================================\n")
+        logger.debug(
+            "❌ REQUEST FAILED:\n"
+            f"   Error: {str(e)}\n"
+            f"   Error Type: {type(e).__name__}\n"
+            f"   Response Time: {response_time:.2f}ms"
+        )
         
         raise e
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    loop = asyncio.get_running_loop()
+    logger.info("🔁 Event loop: %s.%s", type(loop).__module__, type(loop).__name__)
+    
     mongodb_uri = os.getenv("MONGODB_URI")
-    print(f"Connecting to MongoDB with URI: {mongodb_uri[:50]}...")
+    logger.info("Connecting to MongoDB with URI: %s...", mongodb_uri[:50])
     
-    # Add SSL and timeout configurations
+    # Add SSL, timeout and connection pool configurations
+    # Pool limits apply per worker process, so raise WEB_CONCURRENCY with the Atlas connection limit in mind; zstd compresses traffic to Atlas
     app.mongodb_client = AsyncIOMotorClient(
         mongodb_uri,
+        maxPoolSize=20,
+        minPoolSize=5,
+        maxIdleTimeMS=30000,
+        waitQueueTimeoutMS=2500,
         serverSelectionTimeoutMS=5000,
         connectTimeoutMS=10000,
         socketTimeoutMS=10000,
         tls=True,
-        tlsAllowInvalidCertificates=False
+        tlsAllowInvalidCertificates=False,
+        retryWrites=True,
+        compressors="zstd"
     )
     
-    # Test the connection
-    try:
-        await app.mongodb_client.admin.command('ping')
-        print("✅ Connected to MongoDB successfully!")
-    except Exception as e:
-        print(f"❌ Failed to connect to MongoDB: {e}")
-        
     app.mongodb = app.mongodb_client.petlove
+    
+    # Test the connection and ensure indexes concurrently, so startup costs one round trip.
+    # Indexes back the routers' lookups; unique email lets registration skip a pre-check.
+    ping_result, *index_results = await asyncio.gather(
+        app.mongodb_client.admin.command('ping'),
+        app.mongodb["users"].create_index("email", unique=True),
+        app.mongodb["orders"].create_index("userId"),
+        app.mongodb["adoptions"].create_index([("userId", 1), ("petId", 1)]),
+        app.mongodb["appointments"].create_index("userId"),
+        app.mongodb["visits"].create_index([("userId", 1), ("petId", 1), ("date", 1)]),
+        return_exceptions=True
+    )
+    
+    if isinstance(ping_result, Exception):
+        logger.error("❌ Failed to connect to MongoDB: %s", ping_result)
+    else:
+        logger.info("✅ Connected to MongoDB successfully!")
+    
+    index_errors = [result for result in index_results if isinstance(result, Exception)]
+    if index_errors:
+        logger.error("❌ Failed to create indexes: %s", index_errors[0])
+    else:
+        logger.info("✅ Database indexes ready")
+    
     yield
     # Shutdown
     app.mongodb_client.close()
@@ -129,7 +186,7 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add debugging middleware FIRST (before CORS)
+# Debugging middleware; registered before CORS so CORS wraps it and answers preflights first
 @app.middleware("http")
 async def add_debug_middleware(request: Request, call_next):
     return await debug_middleware(request, call_next)
@@ -160,7 +217,7 @@ async def health_check():
     return {"status": "healthy", "message": "Server is running"}
 
 @app.get("/api/debug/routes")
-async def debug_routes():
+async def debug_routes() -> Dict[str, Any]:
     """Debug endpoint to list all registered routes"""
     routes = []
     for route in app.routes:
@@ -173,8 +230,12 @@ async def debug_routes():
     return {"routes": routes}
 
 @app.get("/api/database-info")
-async def get_database_info():
-    """Get information about the database and collections"""
+async def get_database_info() -> Dict[str, Any]:
+    """Get information about the database and collections
+
+    Document counts come from collection metadata, so they may briefly lag
+    behind bulk writes; that's fine for a diagnostics endpoint.
+    """
     try:
         # Get database stats
         db = app.mongodb
@@ -182,11 +243,11 @@ async def get_database_info():
         # List all collections
         collections = await db.list_collection_names()
         
-        # Get document counts for each collection
-        collection_stats = {}
-        for collection_name in collections:
-            count = await db[collection_name].count_documents({})
-            collection_stats[collection_name] = count
+        # Get document counts for each collection concurrently, from collection metadata
+        counts = await asyncio.gather(
+            *(db[collection_name].estimated_document_count() for collection_name in collections)
+        )
+        collection_stats = dict(zip(collections, counts))
         
         return {
             "database_name": "petlove",
@@ -233,4 +294,16 @@ setup_static_files(app)
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 5000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # Auto-reload for local development only; uvicorn can't combine it with workers
+    dev_mode = os.getenv("ENV") == "dev"
+    workers = 1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", "1"))
+    # uvicorn picks uvloop and httptools automatically when they are installed
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="auto",
+        http="auto",
+        workers=workers,
+        reload=dev_mode
+    )
@@ -8,9 +8,13 @@ from bson import ObjectId
 class PyObjectId(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any) -> core_schema.CoreSchema:
+        # Accept ObjectId instances straight from Mongo documents as well as strings
         return core_schema.no_info_after_validator_function(
             cls.validate,
-            core_schema.str_schema(),
+            core_schema.union_schema([
+                core_schema.is_instance_schema(ObjectId),
+                core_schema.str_schema(),
+            ]),
             serialization=core_schema.to_string_ser_schema(),
         )
 
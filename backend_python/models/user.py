@@ -7,6 +7,11 @@ class User(BaseMongoModel):
     password: str
     phone: str
 
+class UserPublic(BaseMongoModel):
+    name: str
+    email: str
+    phone: str
+
 class UserCreate(BaseModel):
     name: str
     email: str
@@ -28,7 +28,7 @@ async def create_adoption(adoption: AdoptionCreate, request: Request):
         
         adoption_dict = adoption.dict()
         result = await request.app.mongodb["adoptions"].insert_one(adoption_dict)
-        created_adoption = await request.app.mongodb["adoptions"].find_one({"_id": result.inserted_id})
+        created_adoption = {**adoption_dict, "_id": result.inserted_id}
         return created_adoption
     except HTTPException:
         raise
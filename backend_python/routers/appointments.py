@@ -19,7 +19,7 @@ async def create_appointment(appointment: AppointmentCreate, request: Request):
     try:
         appointment_dict = appointment.dict()
         result = await request.app.mongodb["appointments"].insert_one(appointment_dict)
-        created_appointment = await request.app.mongodb["appointments"].find_one({"_id": result.inserted_id})
+        created_appointment = {**appointment_dict, "_id": result.inserted_id}
         return created_appointment
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
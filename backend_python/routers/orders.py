@@ -47,7 +47,7 @@ async def create_order(order: OrderCreate, request: Request):
                     item["image"] = default_image
         
         result = await request.app.mongodb["orders"].insert_one(order_dict)
-        created_order = await request.app.mongodb["orders"].find_one({"_id": result.inserted_id})
+        created_order = {**order_dict, "_id": result.inserted_id}
         return created_order
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request
 from models.pet import Pet, PetCreate
 from typing import List
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter()
 
@@ -18,8 +19,13 @@ async def add_pet(pet: PetCreate, request: Request):
     """Add new pet"""
     try:
         pet_dict = pet.dict()
-        result = await request.app.mongodb["pets"].insert_one(pet_dict)
-        created_pet = await request.app.mongodb["pets"].find_one({"_id": result.inserted_id})
+        try:
+            result = await request.app.mongodb["pets"].insert_one(pet_dict)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="A pet with this name and breed already exists")
+        created_pet = {**pet_dict, "_id": result.inserted_id}
         return created_pet
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,121 +1,120 @@
-from fastapi import APIRouter, HTTPException, Request
-from models.user import User, UserCreate, UserLogin, UserResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from models.user import User, UserCreate, UserLogin, UserPublic, UserResponse
 from typing import List
+import asyncio
+import logging
+import os
 import bcrypt
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[User])
-async def get_all_users(request: Request):
-    """Get all users"""
+# bcrypt cost factor for new password hashes
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+@router.get("/", response_model=List[UserPublic])
+async def get_all_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Get a page of users (without password hashes)"""
     try:
-        users = await request.app.mongodb["users"].find().to_list(1000)
+        cursor = request.app.mongodb["users"].find({}, projection={"password": 0}).skip(skip).limit(limit)
+        users = await cursor.to_list(length=limit)
         return users
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/", response_model=User, status_code=201)
-async def register_user(user: UserCreate, request: Request):
-    """Register new user"""
+async def _do_register(user: UserCreate, db, label: str = "") -> dict:
+    """Shared registration logic for POST / and POST /register"""
     try:
-        print(f"🔐 REGISTRATION ATTEMPT: {user.email}")
-        
-        # Check for duplicate email
-        existing_user = await request.app.mongodb["users"].find_one({"email": user.email})
-        if existing_user:
-            print(f"❌ Email already exists: {user.email}")
-            raise HTTPException(status_code=409, detail="Email already registered")
+        logger.debug("🔐 REGISTRATION ATTEMPT%s: %s", label, user.email)
         
         # Hash the password
-        print("🔑 Hashing password...")
-        hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt())
+        logger.debug("🔑 Hashing password...")
+        # bcrypt is CPU-bound, so run it in the thread pool instead of blocking the event loop
+        hashed_password = await asyncio.get_running_loop().run_in_executor(
+            None, bcrypt.hashpw, user.password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)
+        )
         
         user_dict = user.dict()
         user_dict["password"] = hashed_password.decode('utf-8')  # Store as string
         
-        print("💾 Saving user to database...")
-        result = await request.app.mongodb["users"].insert_one(user_dict)
-        created_user = await request.app.mongodb["users"].find_one({"_id": result.inserted_id})
+        logger.debug("💾 Saving user to database...")
+        try:
+            # The unique email index rejects duplicates, so no separate lookup is needed
+            result = await db["users"].insert_one(user_dict)
+        except DuplicateKeyError:
+            logger.debug("❌ Email already exists: %s", user.email)
+            raise HTTPException(status_code=409, detail="Email already registered")
+        # The stored document is already known here, so build the response without a re-fetch
+        created_user = {**user_dict, "_id": result.inserted_id}
         
-        print(f"✅ User registered successfully: {user.email}")
+        logger.debug("✅ User registered successfully: %s", user.email)
         return created_user
     except HTTPException:
         raise
     except Exception as e:
-        print(f"💥 Registration error: {str(e)}")
+        logger.error("💥 Registration error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/", response_model=User, status_code=201)
+async def register_user(user: UserCreate, request: Request):
+    """Register new user"""
+    return await _do_register(user, request.app.mongodb)
+
 @router.post("/register", response_model=User, status_code=201)
 async def register_user_alt(user: UserCreate, request: Request):
     """Register new user (alternative endpoint)"""
-    try:
-        print(f"🔐 REGISTRATION ATTEMPT (ALT): {user.email}")
-        
-        # Check for duplicate email
-        existing_user = await request.app.mongodb["users"].find_one({"email": user.email})
-        if existing_user:
-            print(f"❌ Email already exists: {user.email}")
-            raise HTTPException(status_code=409, detail="Email already registered")
-        
-        # Hash the password
-        print("🔑 Hashing password...")
-        hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt())
-        
-        user_dict = user.dict()
-        user_dict["password"] = hashed_password.decode('utf-8')  # Store as string
-        
-        print("💾 Saving user to database...")
-        result = await request.app.mongodb["users"].insert_one(user_dict)
-        created_user = await request.app.mongodb["users"].find_one({"_id": result.inserted_id})
-        
-        print(f"✅ User registered successfully: {user.email}")
-        return created_user
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"💥 Registration error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _do_register(user, request.app.mongodb, label=" (ALT)")
 
 @router.post("/login", response_model=UserResponse)
 async def login_user(login_data: UserLogin, request: Request):
     """User login with detailed debugging"""
-    print('🔐 LOGIN ATTEMPT:', login_data.dict())
+    logger.debug('🔐 LOGIN ATTEMPT: %s', login_data.email)
     
     try:
         email = login_data.email
         password = login_data.password
         
-        print('📧 Looking for user:', email)
-        user = await request.app.mongodb["users"].find_one({"email": email})
-        print('👤 User found:', bool(user))
+        logger.debug('📧 Looking for user: %s', email)
+        user = await request.app.mongodb["users"].find_one(
+            {"email": email},
+            projection={"_id": 1, "name": 1, "email": 1, "phone": 1, "password": 1}
+        )
+        logger.debug('👤 User found: %s', bool(user))
         
         if not user:
-            print('❌ User not found')
+            logger.debug('❌ User not found')
             raise HTTPException(status_code=400, detail="Invalid credentials")
         
-        print('🔑 Checking password...')
+        logger.debug('🔑 Checking password...')
         # Check if password is hashed (starts with $2b$ for bcrypt)
         stored_password = user["password"]
         
         if stored_password.startswith('$2b$'):
             # Password is hashed, use bcrypt to verify
-            print('🔒 Using bcrypt verification')
-            is_valid = bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8'))
+            logger.debug('🔒 Using bcrypt verification')
+            is_valid = await asyncio.get_running_loop().run_in_executor(
+                None, bcrypt.checkpw, password.encode('utf-8'), stored_password.encode('utf-8')
+            )
         else:
             # Legacy plain text password (for backward compatibility)
-            print('⚠️ Using plain text verification (legacy)')
+            logger.debug('⚠️ Using plain text verification (legacy)')
             is_valid = stored_password == password
             
-        print('✅ Password valid:', is_valid)
+        logger.debug('✅ Password valid: %s', is_valid)
         
         if not is_valid:
-            print('❌ Invalid password')
+            logger.debug('❌ Invalid password')
             raise HTTPException(status_code=400, detail="Invalid credentials")
         
-        print('🎉 Login successful')
+        logger.debug('🎉 Login successful')
         
-        # Return user data without password
-        return UserResponse(
+        # Return user data without password (trusted DB values, so skip re-validation)
+        return UserResponse.model_construct(
             id=str(user["_id"]),
             name=user["name"],
             email=user["email"],
@@ -125,6 +124,5 @@ async def login_user(login_data: UserLogin, request: Request):
     except HTTPException:
         raise
     except Exception as error:
-        print('💥 Login error:', str(error))
-        print('💥 Error type:', type(error).__name__)
+        logger.error('💥 Login error (%s): %s', type(error).__name__, error)
         raise HTTPException(status_code=500, detail="Server error")
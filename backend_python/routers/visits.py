@@ -38,7 +38,7 @@ async def create_visit(visit: VisitCreate, request: Request):
             )
         
         result = await request.app.mongodb["visits"].insert_one(visit_dict)
-        created_visit = await request.app.mongodb["visits"].find_one({"_id": result.inserted_id})
+        created_visit = {**visit_dict, "_id": result.inserted_id}
         return created_visit
     except HTTPException:
         raise
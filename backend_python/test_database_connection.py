@@ -4,36 +4,24 @@ Test database connection and data persistence
 """
 
 import asyncio
-import os
-import requests
+import httpx
 import json
-from motor.motor_asyncio import AsyncIOMotorClient
+from _db import get_client, close_client
 from dotenv import load_dotenv
 from datetime import datetime
 
 # Load environment variables
 load_dotenv()
 
-async def test_database_directly():
+async def test_database_directly(client=None):
     """Test database connection directly"""
     
-    # Get MongoDB URI from environment
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        print("❌ MONGODB_URI not found in environment variables")
-        return False
-    
-    print(f"🔗 Connecting to MongoDB...")
-    
-    # Create MongoDB client
-    client = AsyncIOMotorClient(
-        mongodb_uri,
-        serverSelectionTimeoutMS=5000,
-        connectTimeoutMS=10000,
-        socketTimeoutMS=10000,
-        tls=True,
-        tlsAllowInvalidCertificates=False
-    )
+    # Reuse the caller's client, or open our own
+    owns_client = client is None
+    if owns_client:
+        client = await get_client()
+        if client is None:
+            return False
     
     try:
         # Test connection
@@ -48,37 +36,43 @@ async def test_database_directly():
         print(f"\n📚 Collections in database: {collections}")
         
         # Get document counts for each collection
+        # (metadata-based estimates; may lag a few seconds behind very recent writes)
         print("\n📊 Document counts:")
-        total_docs = 0
-        for collection_name in collections:
-            count = await db[collection_name].count_documents({})
-            total_docs += count
+        counts = await asyncio.gather(
+            *(db[collection_name].estimated_document_count() for collection_name in collections)
+        )
+        total_docs = sum(counts)
+        for collection_name, count in zip(collections, counts):
             print(f"  {collection_name}: {count} documents")
         
         print(f"\n📈 Total documents across all collections: {total_docs}")
         
-        # Test inserting a simple document
+        # Test inserting a batch of documents (one insert_many message instead of 100 round trips)
         print("\n🧪 Testing data insertion...")
-        test_doc = {
-            "test_name": "Database Test",
-            "timestamp": datetime.utcnow(),
-            "test_id": "test_001"
-        }
+        now = datetime.utcnow()
+        test_docs = [
+            {
+                "test_name": "Database Test",
+                "timestamp": now,
+                "test_id": f"test_{i:03d}"
+            }
+            for i in range(100)
+        ]
         
-        # Insert test document
-        result = await db.test_collection.insert_one(test_doc)
-        print(f"✅ Test document inserted with ID: {result.inserted_id}")
+        # Insert test documents
+        result = await db.test_collection.insert_many(test_docs, ordered=False)
+        print(f"✅ {len(result.inserted_ids)} test documents inserted")
         
-        # Verify it was inserted
-        found_doc = await db.test_collection.find_one({"test_id": "test_001"})
-        if found_doc:
-            print(f"✅ Test document found: {found_doc['test_name']}")
+        # Verify they were inserted
+        found_count = await db.test_collection.count_documents({"test_id": {"$regex": "^test_"}})
+        if found_count >= len(test_docs):
+            print(f"✅ Test documents found: {found_count}")
         else:
-            print("❌ Test document not found after insertion")
+            print(f"❌ Only {found_count} of {len(test_docs)} test documents found after insertion")
         
-        # Clean up test document
-        await db.test_collection.delete_one({"test_id": "test_001"})
-        print("🧹 Test document cleaned up")
+        # Clean up test documents
+        await db.test_collection.delete_many({"test_id": {"$regex": "^test_"}})
+        print("🧹 Test documents cleaned up")
         
         return True
         
@@ -87,9 +81,10 @@ async def test_database_directly():
         return False
         
     finally:
-        client.close()
+        if owns_client:
+            await close_client()
 
-def test_api_endpoints():
+async def test_api_endpoints():
     """Test API endpoints"""
     
     base_url = "http://localhost:5000/api"
@@ -97,8 +92,16 @@ def test_api_endpoints():
     print("\n🌐 Testing API endpoints...")
     
     try:
+        # Fire all three requests at once over one keep-alive connection pool
+        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+            root_response, info_response, users_response = await asyncio.gather(
+                client.get(f"{base_url}"),
+                client.get(f"{base_url}/database-info"),
+                client.get(f"{base_url}/users")
+            )
+        
         # Test root endpoint
-        response = requests.get(f"{base_url}")
+        response = root_response
         if response.status_code == 200:
             print("✅ API root endpoint working")
             print(f"   Response: {response.json()}")
@@ -106,7 +109,7 @@ def test_api_endpoints():
             print(f"❌ API root endpoint failed: {response.status_code}")
         
         # Test database-info endpoint
-        response = requests.get(f"{base_url}/database-info")
+        response = info_response
         if response.status_code == 200:
             data = response.json()
             print("✅ Database info endpoint working")
@@ -116,7 +119,7 @@ def test_api_endpoints():
             print(f"❌ Database info endpoint failed: {response.status_code}")
         
         # Test users endpoint
-        response = requests.get(f"{base_url}/users")
+        response = users_response
         if response.status_code == 200:
             users = response.json()
             print(f"✅ Users endpoint working - Found {len(users)} users")
@@ -125,7 +128,7 @@ def test_api_endpoints():
         else:
             print(f"❌ Users endpoint failed: {response.status_code}")
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Could not connect to API server. Is it running on localhost:5000?")
     except Exception as e:
         print(f"❌ API test failed: {e}")
@@ -138,7 +141,7 @@ async def main():
     db_success = await test_database_directly()
     
     # Test API endpoints
-    test_api_endpoints()
+    await test_api_endpoints()
     
     if db_success:
         print("\n✅ Database tests completed successfully!")
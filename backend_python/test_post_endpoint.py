@@ -3,7 +3,8 @@
 Test script to verify the POST /api/users endpoint works correctly
 """
 
-import requests
+import asyncio
+import httpx
 import json
 
 # Test data
@@ -14,12 +15,12 @@ test_user = {
     "phone": "1234567890"
 }
 
-def test_local_endpoint():
+async def test_local_endpoint(client):
     """Test the endpoint locally"""
     url = "http://localhost:5000/api/users"
     
     try:
-        response = requests.post(url, json=test_user)
+        response = await client.post(url, json=test_user)
         print(f"Local test - Status Code: {response.status_code}")
         print(f"Local test - Response: {response.text}")
         return response.status_code == 201
@@ -27,12 +28,12 @@ def test_local_endpoint():
         print(f"Local test failed: {e}")
         return False
 
-def test_production_endpoint():
+async def test_production_endpoint(client):
     """Test the endpoint on production"""
     url = "https://petloves-nedk.onrender.com/api/users"
     
     try:
-        response = requests.post(url, json=test_user)
+        response = await client.post(url, json=test_user)
         print(f"Production test - Status Code: {response.status_code}")
         print(f"Production test - Response: {response.text}")
         return response.status_code == 201
@@ -40,12 +41,12 @@ def test_production_endpoint():
         print(f"Production test failed: {e}")
         return False
 
-def test_get_endpoint():
+async def test_get_endpoint(client):
     """Test the GET endpoint to verify it works"""
     url = "https://petloves-nedk.onrender.com/api/users"
     
     try:
-        response = requests.get(url)
+        response = await client.get(url)
         print(f"GET test - Status Code: {response.status_code}")
         print(f"GET test - Response: {response.text}")
         return response.status_code == 200
@@ -53,13 +54,16 @@ def test_get_endpoint():
         print(f"GET test failed: {e}")
         return False
 
+async def main():
+    """Run the GET, production POST and local POST checks concurrently"""
+    # One client keeps connections (and the TLS session to production) alive across calls
+    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+        await asyncio.gather(
+            test_get_endpoint(client),
+            test_production_endpoint(client),
+            test_local_endpoint(client)
+        )
+
 if __name__ == "__main__":
-    print("Testing POST /api/users endpoint...")
-    print("\n1. Testing GET endpoint first:")
-    test_get_endpoint()
-    
-    print("\n2. Testing POST endpoint on production:")
-    test_production_endpoint()
-    
-    print("\n3. Testing POST endpoint locally (if server is running):")
-    test_local_endpoint()
+    print("Testing GET and POST /api/users endpoints (production and local, if the server is running)...")
+    asyncio.run(main())